@@ -7,15 +7,40 @@ Useful for Russian-language books and translations.
 """
 __author__ = 'Amadeus'
 
+import io
 import re
-import json
+import base64
+import ssl
+import gzip
 import time
+import shutil
+import threading
+import http.client
+import http.cookiejar
 import lxml.html as html
+from lxml import etree
 import urllib.parse
+import urllib.request
+from itertools import groupby
+from operator import itemgetter
 
+try:
+    # Faster JSON-LD parsing when available; Calibre itself does not ship it
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+from calibre import get_proxies
 from calibre.ebooks.metadata.book.base import Metadata
 from calibre.ebooks.metadata.sources.base import Source
 
+_ID_RE = re.compile(r'/book/(\d+)')
+_SERIES_IDX_RE = re.compile(r'#(\d+)')
+_WORD_RE = re.compile(r'\w+')
+_PUBYEAR_LABEL = 'Год издания'
+_PUBYEAR_LABEL_BYTES = _PUBYEAR_LABEL.encode('utf-8')
+_BOOK_MARKER = '"Book"'
+
 
 class LivelibMetadataSourcePlugin(Source):
     name = 'Livelib.ru'
@@ -39,6 +64,25 @@ class LivelibMetadataSourcePlugin(Source):
     # Minimum time between requests (seconds)
     MIN_REQUEST_INTERVAL = 0.5
 
+    # Reused for every page; lxml.html's parser keeps HtmlElement helpers
+    # such as text_content() available on the parsed tree
+    _HTML_PARSER = html.HTMLParser(recover=True, encoding='utf-8')
+
+    # Keep-alive connections per host, so search page, book page and cover
+    # share TLS handshakes; created lazily on first request
+    MAX_REDIRECTS = 5
+    _pool = None
+    _pool_headers = None
+    _pool_lock = threading.Lock()
+    _proxies = None
+    _ssl_ctx = None
+    _cookie_jar = None
+
+    # Start time of the last request, shared by all threads so requests stay
+    # MIN_REQUEST_INTERVAL apart even when fetched concurrently
+    _last_request = 0.0
+    _rate_lock = threading.Lock()
+
     def get_book_url(self, identifiers):
         """Return URL for book page given identifiers."""
         livelib_id = identifiers.get('livelib')
@@ -48,7 +92,7 @@ class LivelibMetadataSourcePlugin(Source):
 
     def id_from_url(self, url):
         """Extract livelib ID from URL."""
-        match = re.search(r'/book/(\d+)', url)
+        match = _ID_RE.search(url)
         if match:
             return match.group(1)
         return None
@@ -61,162 +105,421 @@ class LivelibMetadataSourcePlugin(Source):
             return self.cached_identifier_to_cover_url(f'livelib:{livelib_id}')
         return None
 
+    def _proxy_for(self, scheme):
+        """Return (host, port, auth) of the proxy Calibre uses for scheme.
+
+        auth is a Proxy-Authorization header value when the proxy setting
+        carries user:pass@ credentials, else None. Returns None without a
+        proxy.
+        """
+        if self._proxies is None:
+            self._proxies = get_proxies(debug=False)
+        proxy = self._proxies.get(scheme)
+        if not proxy:
+            return None
+        parts = urllib.parse.urlsplit('//' + proxy.split('://')[-1])
+        auth = None
+        if parts.username:
+            creds = '{}:{}'.format(urllib.parse.unquote(parts.username),
+                                   urllib.parse.unquote(parts.password or ''))
+            auth = 'Basic ' + base64.b64encode(creds.encode('utf-8')).decode('ascii')
+        return parts.hostname, parts.port or 80, auth
+
+    def _ssl_context(self):
+        """SSL context honouring the certificate verification preference."""
+        if self._ssl_ctx is None:
+            if self.prefs.get('verify_ssl_certificates', True):
+                self._ssl_ctx = ssl.create_default_context()
+            else:
+                self._ssl_ctx = ssl._create_unverified_context()
+        return self._ssl_ctx
+
+    def _new_connection(self, key, timeout):
+        """Open a new connection for a (scheme, host) pool key."""
+        scheme, host = key
+        proxy = self._proxy_for(scheme)
+        if scheme == 'http':
+            if proxy:
+                return http.client.HTTPConnection(proxy[0], proxy[1], timeout=timeout)
+            return http.client.HTTPConnection(host, timeout=timeout)
+        context = self._ssl_context()
+        if proxy:
+            proxy_host, proxy_port, auth = proxy
+            conn = http.client.HTTPSConnection(proxy_host, proxy_port,
+                                               timeout=timeout, context=context)
+            conn.set_tunnel(host, headers={'Proxy-Authorization': auth} if auth else None)
+            return conn
+        return http.client.HTTPSConnection(host, timeout=timeout, context=context)
+
+    def _acquire_connection(self, key, timeout):
+        """Take an idle keep-alive connection for key, or open a new one."""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = {}
+            idle = self._pool.setdefault(key, [])
+            conn = idle.pop() if idle else None
+        if conn is None:
+            return self._new_connection(key, timeout), False
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, True
+
+    def _release_connection(self, key, conn):
+        """Return a connection to the pool for reuse."""
+        with self._pool_lock:
+            self._pool.setdefault(key, []).append(conn)
+
+    def _send(self, conn, target, headers):
+        """Send a GET on conn and return the response."""
+        conn.request('GET', target, headers=headers)
+        return conn.getresponse()
+
+    def _http_get(self, url, timeout=30, chunk_size=None):
+        """GET url over a pooled keep-alive connection and return the body.
+
+        Honours Calibre's proxy settings, keeps cookies across requests and
+        accepts gzip. With chunk_size the body is streamed in blocks of that
+        size, which cuts the number of small reads for binary downloads such
+        as covers.
+        """
+        if self._pool_headers is None:
+            self._pool_headers = {
+                'User-Agent': self.user_agent,
+                'Accept-Encoding': 'gzip',
+                'Connection': 'keep-alive',
+            }
+        if self._cookie_jar is None:
+            self._cookie_jar = http.cookiejar.CookieJar()
+        for _ in range(self.MAX_REDIRECTS + 1):
+            if url.startswith('//'):
+                url = f'https:{url}'
+            parts = urllib.parse.urlsplit(url)
+            key = (parts.scheme, parts.netloc)
+            http_proxy = self._proxy_for('http') if key[0] == 'http' else None
+            if http_proxy:
+                # Plain HTTP proxies expect the absolute URL as request target
+                target = urllib.parse.urlunsplit(parts._replace(fragment=''))
+            else:
+                target = parts.path or '/'
+                if parts.query:
+                    target = f'{target}?{parts.query}'
+            request = urllib.request.Request(url, headers=self._pool_headers)
+            self._cookie_jar.add_cookie_header(request)
+            headers = dict(request.header_items())
+            if http_proxy and http_proxy[2]:
+                headers['Proxy-Authorization'] = http_proxy[2]
+
+            conn, reused = self._acquire_connection(key, timeout)
+            try:
+                response = self._send(conn, target, headers)
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                if not reused:
+                    raise
+                # The server dropped an idle connection, retry on a fresh one
+                conn = self._new_connection(key, timeout)
+                try:
+                    response = self._send(conn, target, headers)
+                except Exception:
+                    conn.close()
+                    raise
+            try:
+                if chunk_size:
+                    buf = io.BytesIO()
+                    shutil.copyfileobj(response, buf, length=chunk_size)
+                    data = buf.getvalue()
+                else:
+                    data = response.read()
+            except Exception:
+                conn.close()
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self._release_connection(key, conn)
+
+            self._cookie_jar.extract_cookies(response, request)
+            if response.status in (301, 302, 303, 307, 308):
+                url = urllib.parse.urljoin(url, response.getheader('Location', ''))
+                continue
+            if response.status != 200:
+                raise http.client.HTTPException(f'HTTP {response.status} for {url}')
+            if response.getheader('Content-Encoding', '').lower() == 'gzip':
+                data = gzip.decompress(data)
+            return data
+        raise http.client.HTTPException(f'Too many redirects for {url}')
+
+    def _wait_turn(self):
+        """Block until MIN_REQUEST_INTERVAL has passed since the last request."""
+        cls = type(self)
+        with cls._rate_lock:
+            wait = cls._last_request + self.MIN_REQUEST_INTERVAL - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            cls._last_request = time.monotonic()
+
+    def _limited_get(self, url, timeout=30, chunk_size=None):
+        """_http_get spaced MIN_REQUEST_INTERVAL after the previous request."""
+        self._wait_turn()
+        return self._http_get(url, timeout, chunk_size)
+
     def _fetch_page(self, url, log, timeout=30):
-        """Fetch a page using Calibre's browser."""
+        """Fetch a page over the shared keep-alive connection pool."""
         try:
-            time.sleep(self.MIN_REQUEST_INTERVAL)
-            br = self.browser
-            response = br.open_novisit(url, timeout=timeout)
-            return response.read()
+            return self._limited_get(url, timeout)
         except Exception as e:
             log.exception(f'Error fetching {url}: {e}')
             return None
 
+    def _absolute_url(self, href):
+        """Convert a relative livelib link to an absolute URL."""
+        if not href.startswith('http'):
+            return f'{self.BASE_URL}{href}'
+        return href
+
+    def _tokens(self, text):
+        """Casefolded word tokens of text, used for both sides of a match."""
+        return frozenset(_WORD_RE.findall(text.casefold()))
+
+    def _link_text(self, elem):
+        """Text of a link and its direct children, without a subtree walk."""
+        parts = [elem.text or '']
+        for child in elem:
+            if isinstance(child.tag, str) and child.text:
+                parts.append(child.text)
+            if child.tail:
+                parts.append(child.tail)
+        return ' '.join(parts)
+
+    def _author_overlap(self, elem, author_toks):
+        """Share of author tokens found in the search result card of elem."""
+        parent = elem.getparent()
+        if parent is None:
+            return 0
+        card_toks = self._tokens(parent.text_content())
+        return len(author_toks & card_toks) / len(author_toks)
+
     def _extract_json_ld(self, root, log):
         """Extract JSON-LD structured data from page."""
-        scripts = root.xpath('//script[@type="application/ld+json"]/text()')
-        for script in scripts:
+        for s in root.iter('script'):
+            if s.get('type') != 'application/ld+json' or not s.text:
+                continue
+            # "@type": "Book" must appear literally, skip WebSite,
+            # BreadcrumbList etc. without parsing them
+            if _BOOK_MARKER not in s.text:
+                continue
             try:
-                data = json.loads(script)
+                data = _json.loads(s.text)
                 if isinstance(data, dict) and data.get('@type') == 'Book':
                     return data
-            except json.JSONDecodeError:
+            except _json.JSONDecodeError:
                 continue
         return None
 
-    def parse_book_page(self, book_url, log, timeout=30):
-        """Parse a book page and extract metadata."""
+    def _load_book_page(self, book_url, log, timeout=30):
+        """Return (root, json_ld, raw_html) for a book page."""
         log.info(f'Fetching book page: {book_url}')
-
         raw_html = self._fetch_page(book_url, log, timeout)
         if not raw_html:
             return None
 
         try:
-            root = html.fromstring(raw_html)
+            root = etree.fromstring(raw_html, self._HTML_PARSER)
         except Exception as e:
             log.exception(f'Error parsing HTML: {e}')
             return None
+        if root is None:
+            log.error(f'Empty document: {book_url}')
+            return None
 
         # Try JSON-LD first (most reliable)
         json_ld = self._extract_json_ld(root, log)
+        # Cache cover URL, also for pages identify later rejects
+        book_id = self.id_from_url(book_url)
+        if json_ld and json_ld.get('image') and book_id:
+            self.cache_identifier_to_cover_url(f'livelib:{book_id}', json_ld['image'])
+        return root, json_ld, raw_html
+
+    def _parse_from_jsonld(self, json_ld, log):
+        """Extract metadata fields from JSON-LD data into a dict."""
+        fields = {
+            'title': '',
+            'authors': [],
+            'isbn': None,
+            'publisher': None,
+            'genres': [],
+            'series': None,
+            'series_index': None,
+            'description': None,
+            'rating': None,
+            'pub_year': None,
+        }
+        if not json_ld:
+            return fields
+
+        log.info('Found JSON-LD data')
+        fields['title'] = json_ld.get('name', '')
+        log.debug('Title from JSON-LD:', fields['title'])
+
+        # Author
+        authors = fields['authors']
+        author_data = json_ld.get('author')
+        if author_data:
+            if isinstance(author_data, dict):
+                author_name = author_data.get('name')
+                if author_name:
+                    authors.append(author_name)
+            elif isinstance(author_data, list):
+                for a in author_data:
+                    if isinstance(a, dict) and a.get('name'):
+                        authors.append(a['name'])
+        log.debug('Authors from JSON-LD:', authors)
+
+        isbn = json_ld.get('isbn')
+        if isbn:
+            fields['isbn'] = isbn
+            log.debug('ISBN from JSON-LD:', isbn)
+
+        publisher_data = json_ld.get('publisher')
+        if publisher_data and isinstance(publisher_data, dict):
+            fields['publisher'] = publisher_data.get('name')
+            log.debug('Publisher from JSON-LD:', fields['publisher'])
+
+        genres = fields['genres']
+        genre = json_ld.get('genre')
+        if genre:
+            if isinstance(genre, str):
+                genres.append(genre)
+            elif isinstance(genre, list):
+                genres.extend(genre)
+            log.debug('Genres from JSON-LD:', genres)
+
+        fields['description'] = json_ld.get('description')
+
+        # Rating
+        rating_data = json_ld.get('aggregateRating')
+        if rating_data and isinstance(rating_data, dict):
+            try:
+                fields['rating'] = float(rating_data.get('ratingValue', 0))
+                log.debug('Rating from JSON-LD:', fields['rating'])
+            except (ValueError, TypeError):
+                pass
 
-        title = ''
-        authors = []
-        isbn = None
-        publisher = None
-        genres = []
-        series = None
-        series_index = None
-        description = None
-        rating = None
-        cover_url = None
-        pub_year = None
-
-        # Extract from JSON-LD if available
-        if json_ld:
-            log.info('Found JSON-LD data')
-            title = json_ld.get('name', '')
-            log.info(f'Title from JSON-LD: {title}')
-
-            # Author
-            author_data = json_ld.get('author')
-            if author_data:
-                if isinstance(author_data, dict):
-                    author_name = author_data.get('name')
-                    if author_name:
-                        authors.append(author_name)
-                elif isinstance(author_data, list):
-                    for a in author_data:
-                        if isinstance(a, dict) and a.get('name'):
-                            authors.append(a['name'])
-            log.info(f'Authors from JSON-LD: {authors}')
-
-            isbn = json_ld.get('isbn')
-            if isbn:
-                log.info(f'ISBN from JSON-LD: {isbn}')
-
-            publisher_data = json_ld.get('publisher')
-            if publisher_data and isinstance(publisher_data, dict):
-                publisher = publisher_data.get('name')
-                log.info(f'Publisher from JSON-LD: {publisher}')
-
-            genre = json_ld.get('genre')
-            if genre:
-                if isinstance(genre, str):
-                    genres.append(genre)
-                elif isinstance(genre, list):
-                    genres.extend(genre)
-                log.info(f'Genres from JSON-LD: {genres}')
-
-            description = json_ld.get('description')
-
-            # Rating
-            rating_data = json_ld.get('aggregateRating')
-            if rating_data and isinstance(rating_data, dict):
-                try:
-                    rating = float(rating_data.get('ratingValue', 0))
-                    log.info(f'Rating from JSON-LD: {rating}')
-                except (ValueError, TypeError):
-                    pass
-
-            # Cover image
-            cover_url = json_ld.get('image')
-            if cover_url:
-                log.info(f'Cover URL from JSON-LD: {cover_url}')
-
-        # Fallback: extract from HTML if JSON-LD missing data
-        if not title:
-            h1 = root.xpath('//h1/text()')
-            if h1:
-                title = h1[0].strip()
-                log.info(f'Title from H1: {title}')
-
-        if not authors:
-            author_links = root.xpath('//a[contains(@href, "/author/")]/text()')
+        # Cover image, cached by _load_book_page
+        cover_url = json_ld.get('image')
+        if cover_url:
+            log.debug('Cover URL from JSON-LD:', cover_url)
+
+        return fields
+
+    def _is_complete(self, fields, need_series, need_year):
+        """Whether JSON-LD already gave everything the HTML could add."""
+        return bool(fields['title'] and fields['authors'] and fields['genres']) \
+            and not (need_series or need_year)
+
+    def _parse_from_html(self, root, fields, need_series, need_year, log):
+        """Fill fields that JSON-LD did not supply from the page HTML."""
+        need_title = not fields['title']
+        need_authors = not fields['authors']
+        need_genres = not fields['genres']
+
+        # Collect all HTML fallback candidates in a single pass over the tree
+        h1_text = None
+        author_links = []
+        series_link = None
+        genre_links = []
+        year_text = None
+        for el in root.iter():
+            tag = el.tag
+            if not isinstance(tag, str):  # Skip comments and processing instructions
+                continue
+            if tag == 'h1':
+                if need_title and h1_text is None and el.text:
+                    h1_text = el.text
+            elif tag == 'a':
+                href = el.get('href') or ''
+                if '/author/' in href:
+                    if need_authors and el.text:
+                        author_links.append(el.text)
+                elif '/series/' in href or '/pubseries/' in href:
+                    if need_series and series_link is None and el.text_content().strip():
+                        series_link = el
+                elif '/genre/' in href:
+                    if need_genres and el.text:
+                        genre_links.append(el.text)
+            if need_year and year_text is None and el.text and _PUBYEAR_LABEL in el.text:
+                # Value lives in the first following sibling that carries text
+                for sib in el.itersiblings():
+                    if isinstance(sib.tag, str) and sib.text:
+                        year_text = sib.text
+                        break
+
+        if need_title and h1_text:
+            fields['title'] = h1_text.strip()
+            log.debug('Title from H1:', fields['title'])
+
+        if need_authors:
+            authors = fields['authors']
+            seen_authors = set()
             for author in author_links[:3]:  # Limit to first 3 to avoid sidebar
                 author = author.strip()
-                if author and author not in authors:
+                if author and author not in seen_authors:
+                    seen_authors.add(author)
                     authors.append(author)
-            log.info(f'Authors from HTML: {authors}')
+            log.debug('Authors from HTML:', authors)
 
         # Series (not in JSON-LD, must parse HTML)
-        series_links = root.xpath('//a[contains(@href, "/series/") or contains(@href, "/pubseries/")]')
-        for link in series_links:
-            series_text = link.text_content().strip()
-            if series_text:
-                series = series_text
-                log.info(f'Series from HTML: {series}')
-                # Try to find series index
-                tail = link.tail
-                if tail:
-                    index_match = re.search(r'#(\d+)', tail)
-                    if index_match:
-                        series_index = int(index_match.group(1))
-                        log.info(f'Series index: {series_index}')
-                break
+        if series_link is not None:
+            fields['series'] = series_link.text_content().strip()
+            log.debug('Series from HTML:', fields['series'])
+            # Try to find series index
+            tail = series_link.tail
+            if tail:
+                index_match = _SERIES_IDX_RE.search(tail)
+                if index_match:
+                    fields['series_index'] = int(index_match.group(1))
+                    log.debug('Series index:', fields['series_index'])
 
         # Additional genres from HTML
-        if not genres:
-            genre_links = root.xpath('//a[contains(@href, "/genre/")]/text()')
+        if need_genres:
+            genres = fields['genres']
+            seen_genres = set()
             for genre in genre_links:
                 genre = genre.strip()
-                if genre and genre not in genres:
+                if genre and genre not in seen_genres:
+                    seen_genres.add(genre)
                     genres.append(genre)
-            log.info(f'Genres from HTML: {genres}')
+            log.debug('Genres from HTML:', genres)
 
         # Publication year from HTML
-        year_match = root.xpath('//*[contains(text(), "Год издания")]/following-sibling::*/text()')
-        if year_match:
+        if year_text:
             try:
-                pub_year = int(year_match[0].strip())
-                log.info(f'Publication year: {pub_year}')
+                fields['pub_year'] = int(year_text.strip())
+                log.debug('Publication year:', fields['pub_year'])
             except (ValueError, IndexError):
                 pass
 
+    def parse_book_page(self, book_url, log, timeout=30):
+        """Parse a book page and extract metadata."""
+        page = self._load_book_page(book_url, log, timeout)
+        if page is None:
+            return None
+        root, json_ld, raw_html = page
+
+        fields = self._parse_from_jsonld(json_ld, log)
+        # Series and year are never in JSON-LD, so check the raw bytes for
+        # them; fully tagged pages without either skip the HTML walk
+        need_series = b'/series/' in raw_html or b'/pubseries/' in raw_html
+        need_year = _PUBYEAR_LABEL_BYTES in raw_html
+        if not self._is_complete(fields, need_series, need_year):
+            self._parse_from_html(root, fields, need_series, need_year, log)
+
         # Extract book ID from URL
         book_id = self.id_from_url(book_url)
 
+        title = fields['title']
+        authors = fields['authors']
         if not title or not authors:
             log.info('Missing title or authors, skipping')
             return None
@@ -227,38 +530,34 @@ class LivelibMetadataSourcePlugin(Source):
         if book_id:
             mi.set_identifier('livelib', book_id)
 
-        if isbn:
-            mi.set_identifier('isbn', isbn)
+        if fields['isbn']:
+            mi.set_identifier('isbn', fields['isbn'])
 
-        if genres:
-            mi.tags = genres
+        if fields['genres']:
+            mi.tags = fields['genres']
 
-        if series:
-            mi.series = series
-            if series_index:
-                mi.series_index = series_index
+        if fields['series']:
+            mi.series = fields['series']
+            if fields['series_index']:
+                mi.series_index = fields['series_index']
 
-        if publisher:
-            mi.publisher = publisher
+        if fields['publisher']:
+            mi.publisher = fields['publisher']
 
-        if description:
-            mi.comments = description
+        if fields['description']:
+            mi.comments = fields['description']
 
-        if rating:
+        if fields['rating']:
             # Calibre uses 0-10 scale, Livelib uses 0-5
-            mi.rating = rating * 2
+            mi.rating = fields['rating'] * 2
 
-        if pub_year:
+        if fields['pub_year']:
             from calibre.utils.date import parse_only_date
             try:
-                mi.pubdate = parse_only_date(str(pub_year))
+                mi.pubdate = parse_only_date(str(fields['pub_year']))
             except:
                 pass
 
-        # Cache cover URL
-        if cover_url and book_id:
-            self.cache_identifier_to_cover_url(f'livelib:{book_id}', cover_url)
-
         log.info(f'Metadata extracted: {mi.title} by {mi.authors}')
         return mi
 
@@ -297,7 +596,7 @@ class LivelibMetadataSourcePlugin(Source):
         log.info(f'Searching for: "{search_query}"')
 
         # URL encode the query
-        encoded_query = urllib.parse.quote(search_query.encode('utf8'))
+        encoded_query = urllib.parse.quote(search_query, safe='')
         search_url = f'{self.BASE_URL}/find/books/{encoded_query}'
 
         log.info(f'Search URL: {search_url}')
@@ -308,14 +607,31 @@ class LivelibMetadataSourcePlugin(Source):
             return
 
         try:
-            root = html.fromstring(raw_html)
+            root = etree.fromstring(raw_html, self._HTML_PARSER)
         except Exception as e:
             log.exception(f'Error parsing search results: {e}')
             return
+        if root is None:
+            log.error('Search results page is empty')
+            return
 
-        # Find book links in search results
-        book_links = root.xpath('//a[contains(@href, "/book/")]/@href')
-        book_links = list(dict.fromkeys(book_links))  # Remove duplicates
+        # Find book links in search results. link_map keeps (element, text)
+        # of the first anchor per href that has text, since cards often open
+        # with a text-less cover link; it doubles as the seen-set for the
+        # order-preserving dedupe
+        link_map = {}
+        book_links = []
+        for a in root.iter('a'):
+            h = a.get('href')
+            if not h or '/book/' not in h:
+                continue
+            if h not in link_map:
+                link_map[h] = (a, self._link_text(a).strip())
+                book_links.append(h)
+            elif not link_map[h][1]:
+                text = self._link_text(a).strip()
+                if text:
+                    link_map[h] = (a, text)
 
         log.info(f'Found {len(book_links)} book links')
 
@@ -323,39 +639,44 @@ class LivelibMetadataSourcePlugin(Source):
             log.info('No books found in search results')
             return
 
-        # Try to find best match
-        title_lower = title_tokens.lower()
-        author_lower = author_tokens.lower() if author_tokens else ''
-
-        best_match = None
-        for href in book_links[:20]:  # Check first 20
+        # Score each result by the share of title tokens found in its link
+        # text, then by author overlap, then by the share of the link's own
+        # tokens that are in the title, so extra words in a result cost it
+        # ties. Ranking uses link text only; when authors are given, the
+        # card text is built just for the results tied on the best title
+        # overlap, and the author must appear in it
+        title_toks = self._tokens(title_tokens)
+        author_toks = self._tokens(author_tokens)
+        candidates = []
+        for href in book_links[:20] if title_toks else ():  # Check first 20
             if abort.is_set():
                 return
 
-            # Get the link element to check its text
-            link_elems = root.xpath(f'//a[@href="{href}"]')
-            if not link_elems:
-                continue
+            cand_toks = self._tokens(link_map[href][1])
+            shared = len(title_toks & cand_toks)
+            if shared:
+                candidates.append((shared / len(title_toks),
+                                   shared / len(cand_toks), href))
+        # Stable sort, so ties stay in search order
+        candidates.sort(key=itemgetter(0), reverse=True)
 
-            link_text = link_elems[0].text_content().strip().lower()
-
-            # Check if title matches
-            if title_lower in link_text or link_text in title_lower:
-                log.info(f'Title match: {link_text}')
-
-                # If we have author, check for author match
-                if author_lower:
-                    # Look in parent container for author
-                    parent = link_elems[0].getparent()
-                    if parent is not None:
-                        parent_text = parent.text_content().lower()
-                        if author_lower in parent_text:
-                            log.info('Author also matches')
-                            best_match = href
-                            break
-                else:
-                    best_match = href
-                    break
+        best_match = None
+        for overlap, group in groupby(candidates, key=itemgetter(0)):
+            scored = []
+            for _, precision, href in group:
+                author_overlap = 0
+                if author_toks:
+                    author_overlap = self._author_overlap(link_map[href][0], author_toks)
+                    if not author_overlap:
+                        continue
+                log.debug('Title match:', href, 'overlap', round(overlap, 2),
+                          'author overlap', round(author_overlap, 2),
+                          'precision', round(precision, 2))
+                scored.append((author_overlap, precision, href))
+            if scored:
+                # max() keeps the earlier result on full ties
+                best_match = max(scored, key=lambda c: c[:2])[2]
+                break
 
         # Fall back to first result if no exact match
         if not best_match and book_links:
@@ -363,11 +684,8 @@ class LivelibMetadataSourcePlugin(Source):
             log.info(f'No exact match, using first result: {best_match}')
 
         if best_match:
-            # Convert relative URL to absolute
-            if not best_match.startswith('http'):
-                best_match = f'{self.BASE_URL}{best_match}'
-
-            mi = self.parse_book_page(best_match, log, timeout)
+            best_url = self._absolute_url(best_match)
+            mi = self.parse_book_page(best_url, log, timeout)
             if mi:
                 if abort.is_set():
                     return
@@ -388,17 +706,10 @@ class LivelibMetadataSourcePlugin(Source):
             cover_url = self.cached_identifier_to_cover_url(f'livelib:{livelib_id}')
 
         if not cover_url and livelib_id:
-            # Fetch book page to get cover URL
+            # Fetch the book page, which caches the cover URL from JSON-LD
             book_url = f'{self.BASE_URL}/book/{livelib_id}'
-            raw_html = self._fetch_page(book_url, log, timeout)
-            if raw_html:
-                try:
-                    root = html.fromstring(raw_html)
-                    json_ld = self._extract_json_ld(root, log)
-                    if json_ld:
-                        cover_url = json_ld.get('image')
-                except:
-                    pass
+            if self._load_book_page(book_url, log, timeout) is not None:
+                cover_url = self.cached_identifier_to_cover_url(f'livelib:{livelib_id}')
 
         if not cover_url:
             log.info('No cover URL found')
@@ -407,10 +718,7 @@ class LivelibMetadataSourcePlugin(Source):
         log.info(f'Downloading cover from: {cover_url}')
 
         try:
-            time.sleep(self.MIN_REQUEST_INTERVAL)
-            br = self.browser
-            response = br.open_novisit(cover_url, timeout=timeout)
-            cover_data = response.read()
+            cover_data = self._limited_get(cover_url, timeout, chunk_size=65536)
 
             if cover_data:
                 result_queue.put((self, cover_data))